@@ -4,6 +4,7 @@ import streamlit as st
 import pandas as pd
 
 from src.data_processing import compute_global_aggregates
+from src.sketches import save_stat_partials
 from src.utils import ensure_directories, load_df, PROCESSED_DIR, validate_merged_schema, required_merged_columns
 
 
@@ -48,7 +49,8 @@ with st.sidebar:
                 else:
                     df_global = compute_global_aggregates(df_merged)
                     df_global.to_csv(PROCESSED_DIR / "global_aggregates.csv", index=False)
-                get_data.clear()
+                save_stat_partials(df_merged)
+                st.cache_data.clear()
                 st.success("Uploaded data saved. The app will use it now.")
                 st.rerun()
         except Exception as e:
@@ -6,10 +6,21 @@ import pandas as pd
 from src.utils import load_df, Constants
 from src.visualization import choropleth_co2_per_capita, global_trends
 from src.eda import top_bottom_by_co2_per_capita, correlations
+from src.sketches import UNKNOWN_CONTINENT, frame_fingerprint, load_stat_moments
+
+
+@st.cache_data(show_spinner=False)
+def get_merged_with_moments():
+    # Fingerprint once per loaded dataset; moments are None when built from other data.
+    merged = load_df("merged.parquet")
+    if merged is None:
+        return None, None
+    return merged, load_stat_moments(frame_fingerprint(merged))
+
 
 st.title("Global Overview")
 
-merged = load_df("merged.parquet")
+merged, moments = get_merged_with_moments()
 global_agg = load_df("global_aggregates.parquet")
 
 if merged is None or global_agg is None:
@@ -40,5 +51,9 @@ with st.expander("Top/Bottom 10 countries by CO₂ per capita"):
         st.dataframe(bottom, use_container_width=True)
 
 with st.expander("Correlation matrix (selected metrics)"):
-    corr = correlations(merged)
+    continents = sorted(merged["continent"].fillna(UNKNOWN_CONTINENT).unique())
+    corr_years = st.slider("Year range", min_value=c.start_year, max_value=c.end_year, value=(c.start_year, c.end_year), step=1, key="corr_years")
+    corr_continents = st.multiselect("Continents (empty = all)", continents, key="corr_continents")
+    corr = correlations(merged, years=corr_years, continents=corr_continents or None,
+                        partials=None if moments is None else (moments, None))
     st.dataframe(corr, use_container_width=True)
\ No newline at end of file
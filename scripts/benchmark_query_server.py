@@ -0,0 +1,116 @@
+"""Local load generator for `src.query_server`.
+
+Start the server (`python -m src.query_server --port 8765`), then run
+`python scripts/benchmark_query_server.py --port 8765 --clients 32 --duration 10`.
+Each client holds one keep-alive connection and requests a random mix of static
+and parameterized endpoints built from the years, continents and countries the
+server reports. Throughput and latency percentiles are printed at the end.
+"""
+from __future__ import annotations
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from typing import List
+from urllib.parse import quote
+
+
+def _get_json(conn: http.client.HTTPConnection, path: str):
+    conn.request("GET", path)
+    resp = conn.getresponse()
+    body = resp.read()
+    if resp.status != 200:
+        raise SystemExit(f"GET {path} returned {resp.status}")
+    return json.loads(body)
+
+
+def _paths(host: str, port: int) -> List[str]:
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    health = _get_json(conn, "/health")
+    countries = _get_json(conn, "/countries")
+    conn.close()
+    years, continents = health["years"], health["continents"]
+    first, last = years[0], years[-1]
+    paths = ["/global", "/countries", "/summary", "/correlations"]
+    paths += [f"/map?year={y}" for y in years]
+    paths += [f"/country?name={quote(c)}" for c in countries[:50]]
+    paths += [f"/summary?start={y}&end={min(y + 9, last)}" for y in years]
+    paths += [f"/correlations?start={y}&end={last}" for y in years[::3]]
+    paths += [f"/summary?start={first}&end={last}&continent={quote(c)}" for c in continents]
+    return paths
+
+
+def _worker(host: str, port: int, paths: List[str], deadline: float, gzip: bool, revalidate: bool,
+            latencies: List[float], errors: List[int], lock: threading.Lock) -> None:
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    etags = {}
+    local, failed = [], 0
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        path = rng.choice(paths)
+        headers = {"Accept-Encoding": "gzip"} if gzip else {}
+        if revalidate and path in etags:
+            headers["If-None-Match"] = etags[path]
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = conn.getresponse()
+            resp.read()
+        except (OSError, http.client.HTTPException):
+            failed += 1
+            conn.close()
+            conn = http.client.HTTPConnection(host, port, timeout=10)
+            continue
+        local.append(time.perf_counter() - start)
+        if resp.status == 200:
+            etags[path] = resp.getheader("ETag")
+        elif resp.status != 304:
+            failed += 1
+    conn.close()
+    with lock:
+        latencies.extend(local)
+        errors.append(failed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local load generator for src.query_server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent keep-alive connections")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds to run")
+    parser.add_argument("--no-gzip", action="store_true", help="Do not send Accept-Encoding: gzip")
+    parser.add_argument("--revalidate", action="store_true", help="Send If-None-Match with previously seen ETags")
+    args = parser.parse_args()
+
+    paths = _paths(args.host, args.port)
+    latencies: List[float] = []
+    errors: List[int] = []
+    lock = threading.Lock()
+    deadline = time.perf_counter() + args.duration
+    threads = [
+        threading.Thread(target=_worker, args=(args.host, args.port, paths, deadline, not args.no_gzip,
+                                               args.revalidate, latencies, errors, lock))
+        for _ in range(args.clients)
+    ]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+
+    print(f"requests: {len(latencies)}  errors: {sum(errors)}  elapsed: {elapsed:.2f}s")
+    if len(latencies) < 2:
+        raise SystemExit("Too few successful requests to report latency percentiles.")
+    latencies.sort()
+    q = statistics.quantiles(latencies, n=100)
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s")
+    print(f"latency ms: p50={q[49] * 1e3:.2f}  p90={q[89] * 1e3:.2f}  p99={q[98] * 1e3:.2f}  max={latencies[-1] * 1e3:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Check `src.query_server` behaviour without external tooling.
+
+Usage: `python scripts/verify_query_server.py [path/to/merged.csv]` (defaults to
+the bundled `assets/data/merged.csv`). Exits non-zero on the first failure.
+
+Covers the LRU cache (single-flight builds, error propagation, eviction),
+Accept-Encoding q-values, If-None-Match parsing, 400/404 handling, non-finite
+values in payloads, and a live round trip over HTTP including gzip, 304
+revalidation and the generic 500 body.
+"""
+from __future__ import annotations
+
+import gzip
+import http.client
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.query_server import (
+    LRUCache,
+    Payload,
+    QueryError,
+    QueryService,
+    _accepts_gzip,
+    _etags,
+    make_server,
+)
+from src.utils import ASSETS_DIR
+
+
+def check(condition: bool, message: str) -> None:
+    if not condition:
+        raise SystemExit(f"FAIL: {message}")
+
+
+def check_cache() -> None:
+    cache = LRUCache(maxsize=2)
+    calls = []
+
+    def slow_build() -> Payload:
+        calls.append(1)
+        time.sleep(0.1)
+        return Payload(b"x", b"x", '"x"')
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_build("k", slow_build))) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    check(len(calls) == 1, f"concurrent misses built {len(calls)} times")
+    check(len(results) == 16 and len({id(r) for r in results}) == 1, "waiters did not share the built payload")
+
+    def failing_build() -> Payload:
+        raise ValueError("boom")
+
+    for _ in range(2):
+        try:
+            cache.get_or_build("bad", failing_build)
+            check(False, "build error was swallowed")
+        except ValueError:
+            pass
+    check(not cache._pending, "failed build left a pending entry")
+
+    for key in ("a", "b", "c"):
+        cache.get_or_build(key, lambda key=key: Payload(key.encode(), b"", f'"{key}"'))
+    check(len(cache) == 2, "cache exceeded maxsize")
+    rebuilt = []
+    cache.get_or_build("a", lambda: rebuilt.append(1) or Payload(b"a", b"", '"a"'))
+    check(rebuilt == [1], "least recently used key was not evicted")
+    print("cache: single-flight, error propagation, eviction")
+
+
+def check_headers() -> None:
+    cases = {
+        "gzip": True,
+        "gzip;q=0": False,
+        "gzip; q=0.5, br": True,
+        "br, GZIP;q=1.0": True,
+        "*": True,
+        "*;q=0": False,
+        "*, gzip;q=0": False,
+        "identity": False,
+        "": False,
+    }
+    for header, expected in cases.items():
+        check(_accepts_gzip(header) is expected, f"_accepts_gzip({header!r}) != {expected}")
+    check(_etags('"a", W/"b"') == ['"a"', '"b"'], "weak ETag prefix not stripped")
+    check(_etags("*") == ["*"], "wildcard If-None-Match not parsed")
+    print("headers: Accept-Encoding q-values, If-None-Match parsing")
+
+
+def check_service(df: pd.DataFrame) -> QueryService:
+    d = df.copy()
+    d.loc[d.index[5], "renewables_share_yoy"] = np.inf
+    d.loc[d.index[6], "gdp_yoy"] = -np.inf
+    service = QueryService(d)
+    name = d.loc[d.index[5], "country_standard"]
+    series = json.loads(service.handle("/country", {"name": [name]}).body)["series"]
+    check(any(row["renewables_share_yoy"] is None for row in series), "inf was not served as null")
+    json.loads(service.handle("/summary", {"start": ["2000"], "end": ["2005"]}).body)
+
+    expected_errors = [
+        ("/nope", {}, 404),
+        ("/map", {}, 400),
+        ("/map", {"year": ["abc"]}, 400),
+        ("/map", {"year": ["1800"]}, 404),
+        ("/country", {}, 400),
+        ("/country", {"name": ["Atlantis"]}, 404),
+        ("/summary", {"start": ["2010"], "end": ["2000"]}, 400),
+        ("/correlations", {"continent": ["Mars"]}, 400),
+    ]
+    for path, query, status in expected_errors:
+        try:
+            service.handle(path, query)
+            check(False, f"{path} {query} did not fail")
+        except QueryError as exc:
+            check(exc.status == status, f"{path} {query} returned {exc.status}, expected {status}")
+
+    other = QueryService(df[df["year"] < 2000].reset_index(drop=True))
+    check(service.fingerprint != other.fingerprint, "different data produced the same fingerprint")
+    print("service: non-finite values, 400/404 paths, fingerprint")
+    return service
+
+
+def check_http(service: QueryService) -> None:
+    def explode(path, query):
+        raise RuntimeError("secret internal detail")
+
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    conn = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=10)
+
+    def get(path, **headers):
+        conn.request("GET", path, headers=headers)
+        resp = conn.getresponse()
+        return resp, resp.read()
+
+    try:
+        resp, body = get("/global", **{"Accept-Encoding": "gzip"})
+        check(resp.status == 200 and resp.getheader("Content-Encoding") == "gzip", "gzip not served")
+        json.loads(gzip.decompress(body))
+        etag = resp.getheader("ETag")
+
+        resp, body = get("/global", **{"Accept-Encoding": "gzip;q=0"})
+        check(resp.getheader("Content-Encoding") is None, "gzip served despite q=0")
+        json.loads(body)
+
+        for tag in (etag, "*"):
+            resp, body = get("/global", **{"If-None-Match": tag})
+            check(resp.status == 304 and body == b"", f"If-None-Match {tag} did not return 304")
+            check(resp.getheader("ETag") == etag and resp.getheader("Vary") == "Accept-Encoding", "304 dropped cache headers")
+
+        resp, body = get("/country?name=Atlantis")
+        check(resp.status == 404 and "error" in json.loads(body), "404 body is not JSON")
+
+        print("http: forcing a 500; the server logs one traceback below")
+        service.handle, original = explode, service.handle
+        try:
+            resp, body = get("/global")
+        finally:
+            service.handle = original
+        check(resp.status == 500 and b"secret" not in body, "500 body leaked exception text")
+    finally:
+        conn.close()
+        server.shutdown()
+        server.server_close()
+    print("http: gzip negotiation, 304 revalidation, 404 and generic 500 bodies")
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else ASSETS_DIR / "data" / "merged.csv"
+    df = pd.read_csv(path)
+    check_cache()
+    check_headers()
+    check_http(check_service(df))
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Check the partial-statistics path against the exact row scan.
+
+Usage: `python scripts/verify_stat_partials.py [path/to/merged.csv]` (defaults to
+the bundled `assets/data/merged.csv`). Exits non-zero on any mismatch.
+
+Moments and correlations must match the exact path to floating-point noise,
+also when columns contain +/-inf (as `pct_change` produces from a zero base).
+Quantiles must match exactly while every group fits in the sketch. With a
+deliberately coarse sketch they must stay within the documented rank-error bound.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.eda import correlations, summary_statistics
+from src.sketches import (
+    GROUP_KEYS,
+    SUMMARY_PERCENTILES,
+    UNKNOWN_CONTINENT,
+    build_stat_partials,
+    sketch_size,
+    stat_columns,
+)
+from src.utils import ASSETS_DIR
+
+
+def _subsets(df: pd.DataFrame):
+    years = sorted(int(y) for y in df["year"].dropna().unique())
+    continents = sorted(df["continent"].fillna(UNKNOWN_CONTINENT).unique())
+    mid = years[len(years) // 2]
+    yield {}
+    yield {"years": (years[0], mid)}
+    yield {"continents": continents[:2]}
+    yield {"years": (mid, mid), "continents": continents[-1:]}
+
+
+def with_infinities(df: pd.DataFrame) -> pd.DataFrame:
+    d = df.copy()
+    d.loc[d.index[5], "renewables_share_yoy"] = np.inf
+    d.loc[d.index[6], "gdp_yoy"] = -np.inf
+    d.loc[d.index[7], "gdp_yoy"] = np.inf
+    # One (year, continent) group whose only renewables_share_yoy value is infinite.
+    group = d.loc[d.index[8], ["year", "continent"]]
+    in_group = (d["year"] == group["year"]) & (d["continent"] == group["continent"])
+    d.loc[in_group, "renewables_share_yoy"] = np.nan
+    d.loc[d.index[8], "renewables_share_yoy"] = np.inf
+    return d
+
+
+def check_exact(df: pd.DataFrame, label: str = "") -> None:
+    partials = build_stat_partials(df)
+    for kw in _subsets(df):
+        pd.testing.assert_frame_equal(
+            summary_statistics(df, **kw), summary_statistics(df, partials=partials, **kw), rtol=1e-9
+        )
+        pd.testing.assert_frame_equal(
+            correlations(df, **kw), correlations(df, partials=partials, **kw), rtol=1e-9, atol=1e-12
+        )
+        print(f"exact match{label}: {kw or 'all rows'}")
+
+
+def check_rank_bound(df: pd.DataFrame, rank_error: float) -> None:
+    k = sketch_size(rank_error)
+    summary = summary_statistics(df, partials=build_stat_partials(df, rank_error=rank_error))
+    d = df.assign(continent=df["continent"].fillna(UNKNOWN_CONTINENT))
+    for col in stat_columns(df):
+        values = np.sort(d[col].dropna().to_numpy(dtype=float))
+        n = len(values)
+        if n < 2:
+            continue
+        sizes = d.dropna(subset=[col]).groupby(GROUP_KEYS).size()
+        compressed = sizes[sizes > k]
+        bound = rank_error * n + len(compressed) + 1
+        for p in SUMMARY_PERCENTILES:
+            estimate = summary.loc[col, f"{p * 100:g}%"]
+            lo = np.searchsorted(values, estimate, side="left")
+            hi = np.searchsorted(values, estimate, side="right")
+            target = p * (n - 1)
+            error = 0.0 if lo <= target <= hi else min(abs(lo - target), abs(hi - target))
+            if error > bound:
+                raise SystemExit(f"{col} p{p}: rank error {error:.1f} exceeds bound {bound:.1f}")
+    print(f"rank error within bound for rank_error={rank_error} (k={k})")
+
+
+def main():
+    path = Path(sys.argv[1]) if len(sys.argv) > 1 else ASSETS_DIR / "data" / "merged.csv"
+    df = pd.read_csv(path)
+    check_exact(df)
+    check_exact(with_infinities(df), " (with inf)")
+    check_rank_bound(df, rank_error=1 / 4)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
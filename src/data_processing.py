@@ -6,7 +6,8 @@ from typing import Tuple
 import numpy as np
 import pandas as pd
 
-from .utils import Constants, add_continent, ensure_directories, save_df, standardize_countries
+from .sketches import save_stat_partials
+from .utils import Constants, add_continent, ensure_directories, load_df, save_df, standardize_countries
 
 
 def _filter_years(df: pd.DataFrame, year_col: str = "year", c: Constants = Constants()) -> pd.DataFrame:
@@ -119,4 +120,6 @@ def build_processed_dataset(co2: pd.DataFrame, energy: pd.DataFrame) -> Tuple[pd
     global_agg = compute_global_aggregates(merged)
     save_df(merged, "merged.parquet")
     save_df(global_agg, "global_aggregates.parquet")
+    # Build partials from the frame as readers will load it, so fingerprints match.
+    save_stat_partials(load_df("merged.parquet"))
     return merged, global_agg
\ No newline at end of file
@@ -1,17 +1,64 @@
 """Exploratory Data Analysis utilities."""
 from __future__ import annotations
 
+from typing import Iterable, Optional, Tuple
+
 import pandas as pd
 
+from .sketches import (
+    SUMMARY_PERCENTILES,
+    UNKNOWN_CONTINENT,
+    correlations_from_partials,
+    stat_columns,
+    summary_from_partials,
+)
+
+
+def _subset(
+    df: pd.DataFrame,
+    years: Optional[Tuple[int, int]] = None,
+    continents: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    if years is not None:
+        df = df[(df["year"] >= years[0]) & (df["year"] <= years[1])]
+    if continents is not None:
+        df = df[df["continent"].fillna(UNKNOWN_CONTINENT).isin(list(continents))]
+    return df
+
+
+def summary_statistics(
+    df: pd.DataFrame,
+    years: Optional[Tuple[int, int]] = None,
+    continents: Optional[Iterable[str]] = None,
+    partials: Optional[Tuple[pd.DataFrame, pd.DataFrame]] = None,
+) -> pd.DataFrame:
+    """Describe core metrics, optionally restricted to a year range and continents.
+
+    With `partials` (moments, quantiles) the result is merged from precomputed
+    per-(year, continent) sketches; otherwise rows of `df` are scanned exactly.
+    Callers without a frame can use `sketches.summary_from_partials` directly.
+    """
+    if partials is not None:
+        moments, quantiles = partials
+        return summary_from_partials(moments, quantiles, years=years, continents=continents)
+    cols = stat_columns(df)
+    return _subset(df, years, continents)[cols].describe(percentiles=SUMMARY_PERCENTILES).T
 
-def summary_statistics(df: pd.DataFrame) -> pd.DataFrame:
-    cols = [c for c in ["co2", "co2_per_capita", "renewables_share_energy", "gdp", "population", "renewables_share_yoy", "gdp_yoy"] if c in df.columns]
-    return df[cols].describe(percentiles=[0.1, 0.25, 0.5, 0.75, 0.9]).T
 
+def correlations(
+    df: pd.DataFrame,
+    years: Optional[Tuple[int, int]] = None,
+    continents: Optional[Iterable[str]] = None,
+    partials: Optional[Tuple[pd.DataFrame, Optional[pd.DataFrame]]] = None,
+) -> pd.DataFrame:
+    """Pearson correlation matrix; merged from `partials` when provided, exact otherwise.
 
-def correlations(df: pd.DataFrame) -> pd.DataFrame:
-    cols = [c for c in ["co2", "co2_per_capita", "renewables_share_energy", "gdp", "population", "renewables_share_yoy", "gdp_yoy"] if c in df.columns]
-    return df[cols].corr(method="pearson")
+    Only the moments (`partials[0]`) are used, so `(moments, None)` is enough.
+    """
+    if partials is not None:
+        return correlations_from_partials(partials[0], years=years, continents=continents)
+    cols = stat_columns(df)
+    return _subset(df, years, continents)[cols].corr(method="pearson")
 
 
 def top_bottom_by_co2_per_capita(df: pd.DataFrame, year: int, top_n: int = 10) -> tuple[pd.DataFrame, pd.DataFrame]:
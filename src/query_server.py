@@ -0,0 +1,380 @@
+"""Read-only HTTP/JSON query service over the processed artifacts.
+
+Run with `python -m src.query_server --port 8765`. The dataset is loaded once
+and kept resident, and the stats partials are rebuilt from it at startup so
+they can never be stale. Static payloads (global aggregates, country list, map
+values per year, unfiltered summary and correlations) are serialized and
+gzip-compressed at startup, while other parameterized queries go through a
+bounded LRU cache that builds each key at most once at a time. Every response
+carries an ETag derived from a fingerprint of the loaded data, so clients can
+revalidate with `If-None-Match`.
+
+Endpoints (all GET):
+- /health (also lists available years and continents)
+- /global
+- /countries
+- /country?name=<country_standard>
+- /map?year=<year>
+- /summary?start=<year>&end=<year>&continent=<a,b>
+- /correlations?start=<year>&end=<year>&continent=<a,b>
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import json
+import threading
+import traceback
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from .data_processing import compute_global_aggregates
+from .eda import correlations, summary_statistics
+from .sketches import build_stat_partials, frame_fingerprint
+from .utils import load_df
+
+
+SERIES_COLUMNS = [
+    "year",
+    "co2",
+    "co2_per_capita",
+    "gdp",
+    "population",
+    "renewables_share_energy",
+    "renewables_share_yoy",
+    "gdp_yoy",
+]
+MAP_COLUMNS = ["iso_code", "country_standard", "co2_per_capita"]
+
+
+class QueryError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass(frozen=True)
+class Payload:
+    body: bytes
+    gzipped: bytes
+    etag: str
+
+
+def _json_ready(df: pd.DataFrame) -> pd.DataFrame:
+    # Plain Python scalars keep full float precision; NaN and ±inf (e.g. pct_change
+    # from a zero base) become null, since JSON has no representation for them.
+    finite = df.notna() & ~df.isin([np.inf, -np.inf])
+    return df.astype(object).where(finite, None)
+
+
+def _records(df: pd.DataFrame) -> list:
+    return _json_ready(df).to_dict(orient="records")
+
+
+def _matrix(df: pd.DataFrame) -> dict:
+    return _json_ready(df).to_dict(orient="index")
+
+
+class LRUCache:
+    """Thread-safe bounded mapping of request keys to payloads.
+
+    Concurrent misses on the same key share a single build: the first caller
+    builds, the others wait on its future.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Payload]" = OrderedDict()
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def get_or_build(self, key: str, build: Callable[[], Payload]) -> Payload:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None:
+                self._data.move_to_end(key)
+                return hit
+            future = self._pending.get(key)
+            owner = future is None
+            if owner:
+                future = self._pending[key] = Future()
+        if not owner:
+            return future.result()
+
+        try:
+            payload = build()
+        except BaseException as exc:
+            with self._lock:
+                del self._pending[key]
+            future.set_exception(exc)
+            raise
+        with self._lock:
+            del self._pending[key]
+            self._data[key] = payload
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        future.set_result(payload)
+        return payload
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class QueryService:
+    """Resident dataset plus precomputed and cached JSON payloads."""
+
+    def __init__(
+        self,
+        merged: pd.DataFrame,
+        global_agg: Optional[pd.DataFrame] = None,
+        cache_size: int = 256,
+    ):
+        self.merged = merged
+        self.global_agg = global_agg if global_agg is not None else compute_global_aggregates(merged)
+        # Rebuilt from the resident frame rather than read from disk, so partials always match `merged`.
+        self.partials = build_stat_partials(merged)
+        self.fingerprint = frame_fingerprint(self.merged, self.global_agg)
+        self.cache = LRUCache(cache_size)
+
+        countries = merged[~merged["is_aggregate"]]
+        self._series: Dict[str, pd.DataFrame] = {
+            name: g[[c for c in SERIES_COLUMNS if c in g.columns]].sort_values("year")
+            for name, g in countries.groupby("country_standard")
+        }
+        self.years = sorted(int(y) for y in merged["year"].dropna().unique())
+        self.continents = sorted(self.partials[0]["continent"].astype(str).unique())
+
+        self._static: Dict[str, Payload] = {
+            "/health": self._payload("/health", {
+                "status": "ok",
+                "fingerprint": self.fingerprint,
+                "rows": len(merged),
+                "years": self.years,
+                "continents": self.continents,
+            }),
+            "/global": self._payload("/global", _records(self.global_agg.sort_values("year"))),
+            "/countries": self._payload("/countries", sorted(self._series)),
+        }
+        map_rows = countries.dropna(subset=["iso_code", "co2_per_capita"])
+        for year, g in map_rows.groupby("year"):
+            key = f"/map?year={int(year)}"
+            self._static[key] = self._payload(key, {"year": int(year), "values": _records(g[MAP_COLUMNS])})
+        full_range = (self.years[0], self.years[-1])
+        for path in ("/summary", "/correlations"):
+            key = _stats_key(path, full_range, None)
+            self._static[key] = self._payload(key, self._stats(path, full_range, None))
+
+    @classmethod
+    def from_processed(cls, cache_size: int = 256) -> "QueryService":
+        merged = load_df("merged.parquet")
+        if merged is None:
+            raise SystemExit("Processed data not found. Run the Streamlit app once to generate data.")
+        return cls(merged, load_df("global_aggregates.parquet"), cache_size=cache_size)
+
+    def _payload(self, key: str, data) -> Payload:
+        body = json.dumps(data, separators=(",", ":"), allow_nan=False).encode("utf-8")
+        tag = hashlib.sha256(f"{self.fingerprint}:{key}".encode("utf-8")).hexdigest()[:32]
+        return Payload(body=body, gzipped=gzip.compress(body, compresslevel=6), etag=f'"{tag}"')
+
+    def handle(self, path: str, query: Dict[str, List[str]]) -> Payload:
+        if path in ("/health", "/global", "/countries"):
+            return self._static[path]
+        if path == "/map":
+            year = _int_param(query, "year", required=True)
+            payload = self._static.get(f"/map?year={year}")
+            if payload is None:
+                raise QueryError(404, f"No map data for year {year}")
+            return payload
+        if path == "/country":
+            name = _str_param(query, "name")
+            if name not in self._series:
+                raise QueryError(404, f"Unknown country: {name}")
+            key = f"/country?name={name}"
+            return self.cache.get_or_build(key, lambda: self._payload(key, {
+                "country": name,
+                "series": _records(self._series[name]),
+            }))
+        if path in ("/summary", "/correlations"):
+            years, continents = self._subset_params(query)
+            key = _stats_key(path, years, continents)
+            if key in self._static:
+                return self._static[key]
+            return self.cache.get_or_build(key, lambda: self._payload(key, self._stats(path, years, continents)))
+        raise QueryError(404, f"Unknown endpoint: {path}")
+
+    def _subset_params(self, query: Dict[str, List[str]]) -> Tuple[Tuple[int, int], Optional[Tuple[str, ...]]]:
+        start = _int_param(query, "start")
+        end = _int_param(query, "end")
+        start = self.years[0] if start is None else start
+        end = self.years[-1] if end is None else end
+        if start > end:
+            raise QueryError(400, "start must not be after end")
+        continents = None
+        if "continent" in query:
+            names = sorted({c.strip() for v in query["continent"] for c in v.split(",") if c.strip()})
+            unknown = [c for c in names if c not in self.continents]
+            if unknown:
+                raise QueryError(400, f"Unknown continent(s): {unknown}")
+            continents = tuple(names) or None
+        return (start, end), continents
+
+    def _stats(self, path: str, years: Tuple[int, int], continents: Optional[Tuple[str, ...]]) -> dict:
+        meta = {"start": years[0], "end": years[1], "continents": list(continents) if continents else None}
+        if path == "/summary":
+            result = summary_statistics(self.merged, years=years, continents=continents, partials=self.partials)
+            return {**meta, "summary": _matrix(result)}
+        result = correlations(self.merged, years=years, continents=continents, partials=self.partials)
+        return {**meta, "correlations": _matrix(result)}
+
+
+def _stats_key(path: str, years: Tuple[int, int], continents: Optional[Tuple[str, ...]]) -> str:
+    return f"{path}?years={years}&continents={continents}"
+
+
+def _str_param(query: Dict[str, List[str]], name: str) -> str:
+    values = query.get(name)
+    if not values or not values[0]:
+        raise QueryError(400, f"Missing query parameter: {name}")
+    return values[0]
+
+
+def _int_param(query: Dict[str, List[str]], name: str, required: bool = False) -> Optional[int]:
+    if name not in query:
+        if required:
+            raise QueryError(400, f"Missing query parameter: {name}")
+        return None
+    try:
+        return int(query[name][0])
+    except ValueError:
+        raise QueryError(400, f"Query parameter {name} must be an integer")
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "GlobalEnergyQuery/1.0"
+    # Headers and body go out as separate writes; without TCP_NODELAY keep-alive
+    # clients stall on delayed ACKs (~40 ms per response).
+    disable_nagle_algorithm = True
+    service: QueryService
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        try:
+            payload = self.service.handle(url.path.rstrip("/") or "/", parse_qs(url.query))
+        except QueryError as exc:
+            self._send_error(exc.status, exc.message)
+            return
+        except Exception:
+            self.log_error("Unhandled error for %s", self.path)
+            traceback.print_exc()
+            self._send_error(500, "Internal server error")
+            return
+
+        etags = _etags(self.headers.get("If-None-Match", ""))
+        if "*" in etags or payload.etag in etags:
+            self.send_response(304)
+            self._send_cache_headers(payload)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        use_gzip = _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        body = payload.gzipped if use_gzip else payload.body
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self._send_cache_headers(payload)
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_cache_headers(self, payload: Payload) -> None:
+        self.send_header("ETag", payload.etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Vary", "Accept-Encoding")
+
+    def _send_error(self, status: int, message: str) -> None:
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_request(self, code="-", size="-") -> None:
+        # Access logs only with --verbose; errors always go to stderr via log_error.
+        if getattr(self.server, "verbose", False):
+            super().log_request(code, size)
+
+
+def _etags(header: str) -> List[str]:
+    return [t.strip().removeprefix("W/") for t in header.split(",") if t.strip()]
+
+
+def _accepts_gzip(header: str) -> bool:
+    """True if Accept-Encoding allows gzip with a non-zero q-value (explicit gzip beats `*`)."""
+    wildcard = None
+    for part in header.split(","):
+        coding, _, params = part.partition(";")
+        coding = coding.strip().lower()
+        if coding not in ("gzip", "*"):
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if coding == "gzip":
+            return q > 0
+        wildcard = q
+    return wildcard is not None and wildcard > 0
+
+
+class QueryHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Deeper accept backlog so bursts of concurrent clients are not refused.
+    request_queue_size = 1024
+    verbose = False
+
+
+def make_server(service: QueryService, host: str = "127.0.0.1", port: int = 8765, verbose: bool = False) -> QueryHTTPServer:
+    handler = type("BoundQueryRequestHandler", (QueryRequestHandler,), {"service": service})
+    server = QueryHTTPServer((host, port), handler)
+    server.verbose = verbose
+    return server
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve processed energy data as JSON.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cache-size", type=int, default=256, help="Max cached parameterized responses")
+    parser.add_argument("--verbose", action="store_true", help="Log every request")
+    args = parser.parse_args(argv)
+
+    service = QueryService.from_processed(cache_size=args.cache_size)
+    server = make_server(service, args.host, args.port, args.verbose)
+    print(f"Serving {len(service.merged)} rows (fingerprint {service.fingerprint[:12]}) on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
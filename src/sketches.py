@@ -0,0 +1,334 @@
+"""Mergeable per-(year, continent) statistics partials.
+
+Two long-format frames are produced by `build_stat_partials`:
+
+- moments: one row per group and column pair (x, y) with x <= y, holding the
+  pairwise-complete count, means, second moments, co-moment and min/max. The
+  diagonal rows (x == y) carry the univariate statistics. Moments use finite
+  values only, as `DataFrame.corr` does; diagonal rows also count +inf/-inf
+  values (`pinf_x`, `ninf_x`) so summaries match `describe`, which keeps them.
+- quantiles: a rank-bucket sketch per group and column. A group with n values
+  is cut into k = ceil(1 / rank_error) equal-rank buckets and each bucket keeps
+  its middle value and size, so a group never stores more than k points. Each
+  point stands for at most ceil(n / k) consecutive ranks, which bounds the rank
+  error of a merged quantile by rank_error * N plus one rank per compressed
+  group. Groups with at most k values are stored as-is and merge exactly.
+
+Partials for any subset of years/continents are combined with Chan's parallel
+update, so summaries and correlations never rescan the merged rows. A small
+meta frame records a fingerprint of the source frame so callers can detect
+partials that are stale relative to the data they loaded.
+"""
+from __future__ import annotations
+
+import hashlib
+import math
+from itertools import combinations_with_replacement
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .utils import load_df, save_df
+
+
+STAT_COLUMNS = [
+    "co2",
+    "co2_per_capita",
+    "renewables_share_energy",
+    "gdp",
+    "population",
+    "renewables_share_yoy",
+    "gdp_yoy",
+]
+SUMMARY_PERCENTILES = [0.1, 0.25, 0.5, 0.75, 0.9]
+GROUP_KEYS = ["year", "continent"]
+UNKNOWN_CONTINENT = "Unknown"
+QUANTILE_RANK_ERROR = 0.01
+MOMENTS_NAME = "stat_moments.parquet"
+QUANTILES_NAME = "stat_quantiles.parquet"
+META_NAME = "stat_partials_meta.parquet"
+
+
+def stat_columns(df: pd.DataFrame) -> List[str]:
+    return [c for c in STAT_COLUMNS if c in df.columns]
+
+
+def frame_fingerprint(*frames: pd.DataFrame) -> str:
+    """Content hash of one or more frames (column names and values, not index)."""
+    h = hashlib.sha256()
+    for df in frames:
+        h.update(",".join(map(str, df.columns)).encode("utf-8"))
+        h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _group_frame(df: pd.DataFrame) -> pd.DataFrame:
+    cols = stat_columns(df)
+    d = df[["year", "continent"] + cols].copy()
+    d["continent"] = d["continent"].fillna(UNKNOWN_CONTINENT).astype(str)
+    for col in cols:
+        d[col] = pd.to_numeric(d[col], errors="coerce").astype(float)
+    return d
+
+
+def _pair_moments(d: pd.DataFrame, x: str, y: str) -> pd.DataFrame:
+    mask = np.isfinite(d[x]) & np.isfinite(d[y])
+    p = d.loc[mask, GROUP_KEYS].copy()
+    p["_x"] = d.loc[mask, x]
+    p["_y"] = d.loc[mask, y]
+    g = p.groupby(GROUP_KEYS)
+    p["_dx"] = p["_x"] - g["_x"].transform("mean")
+    p["_dy"] = p["_y"] - g["_y"].transform("mean")
+    p["_dxx"] = p["_dx"] ** 2
+    p["_dyy"] = p["_dy"] ** 2
+    p["_dxy"] = p["_dx"] * p["_dy"]
+    out = p.groupby(GROUP_KEYS).agg(
+        n=("_x", "size"),
+        mean_x=("_x", "mean"),
+        mean_y=("_y", "mean"),
+        m2_x=("_dxx", "sum"),
+        m2_y=("_dyy", "sum"),
+        c_xy=("_dxy", "sum"),
+        min_x=("_x", "min"),
+        max_x=("_x", "max"),
+    ).reset_index()
+    out["pinf_x"] = 0
+    out["ninf_x"] = 0
+    if x == y:
+        inf = d[GROUP_KEYS].assign(pinf_x=d[x] == np.inf, ninf_x=d[x] == -np.inf).groupby(GROUP_KEYS).sum()
+        inf = inf[(inf["pinf_x"] + inf["ninf_x"]) > 0].reset_index()
+        out = pd.concat([out.set_index(GROUP_KEYS), inf.set_index(GROUP_KEYS)])
+        out = out.groupby(level=GROUP_KEYS).agg({
+            "n": "sum", "mean_x": "first", "mean_y": "first", "m2_x": "first", "m2_y": "first",
+            "c_xy": "first", "min_x": "first", "max_x": "first", "pinf_x": "sum", "ninf_x": "sum",
+        }).reset_index()
+    out["n"] = out["n"].fillna(0).astype(int)
+    out.insert(2, "x", x)
+    out.insert(3, "y", y)
+    return out
+
+
+def sketch_size(rank_error: float) -> int:
+    return int(math.ceil(1.0 / rank_error))
+
+
+def _rank_buckets(values: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    values = np.sort(values)
+    n = len(values)
+    if n <= k:
+        return values, np.ones(n)
+    edges = np.linspace(0, n, k + 1).round().astype(int)
+    sizes = np.diff(edges)
+    return values[edges[:-1] + (sizes - 1) // 2], sizes.astype(float)
+
+
+def build_stat_partials(df: pd.DataFrame, rank_error: float = QUANTILE_RANK_ERROR) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Compute moment and quantile partials per (year, continent) group."""
+    d = _group_frame(df)
+    cols = stat_columns(df)
+    k = sketch_size(rank_error)
+
+    moment_cols = GROUP_KEYS + ["x", "y", "n", "mean_x", "mean_y", "m2_x", "m2_y", "c_xy", "min_x", "max_x", "pinf_x", "ninf_x"]
+    frames = [_pair_moments(d, x, y) for x, y in combinations_with_replacement(cols, 2)]
+    moments = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=moment_cols)
+
+    rows = []
+    for (year, continent), g in d.groupby(GROUP_KEYS):
+        for col in cols:
+            values, weights = _rank_buckets(g[col].dropna().to_numpy(), k)
+            rows.append(pd.DataFrame({
+                "year": year,
+                "continent": continent,
+                "column": col,
+                "value": values,
+                "weight": weights,
+            }))
+    quantile_cols = GROUP_KEYS + ["column", "value", "weight"]
+    quantiles = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(columns=quantile_cols)
+    return moments, quantiles
+
+
+def save_stat_partials(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Build and persist partials for `df`, tagged with its fingerprint.
+
+    Pass the frame as it will be read back (e.g. via `load_df`), since the
+    fingerprint is compared against that frame when the partials are loaded.
+    """
+    moments, quantiles = build_stat_partials(df)
+    save_df(moments, MOMENTS_NAME)
+    save_df(quantiles, QUANTILES_NAME)
+    save_df(pd.DataFrame({"fingerprint": [frame_fingerprint(df)], "rank_error": [QUANTILE_RANK_ERROR]}), META_NAME)
+    return moments, quantiles
+
+
+def _partials_match(fingerprint: str) -> bool:
+    meta = load_df(META_NAME)
+    return meta is not None and not meta.empty and str(meta["fingerprint"].iloc[0]) == fingerprint
+
+
+def load_stat_moments(fingerprint: str) -> Optional[pd.DataFrame]:
+    """Load only the moment partials, or None if missing or built from other data."""
+    if not _partials_match(fingerprint):
+        return None
+    return load_df(MOMENTS_NAME)
+
+
+def load_stat_partials(fingerprint: str) -> Optional[Tuple[pd.DataFrame, pd.DataFrame]]:
+    """Load (moments, quantiles), or None if missing or built from other data."""
+    if not _partials_match(fingerprint):
+        return None
+    moments = load_df(MOMENTS_NAME)
+    quantiles = load_df(QUANTILES_NAME)
+    if moments is None or quantiles is None:
+        return None
+    return moments, quantiles
+
+
+def _present_columns(moments: pd.DataFrame) -> List[str]:
+    present = set(moments["x"].unique())
+    return [c for c in STAT_COLUMNS if c in present]
+
+
+def filter_partials(
+    partials: pd.DataFrame,
+    years: Optional[Tuple[int, int]] = None,
+    continents: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """Select partials for an inclusive year range and/or a set of continents."""
+    mask = pd.Series(True, index=partials.index)
+    if years is not None:
+        mask &= (partials["year"] >= years[0]) & (partials["year"] <= years[1])
+    if continents is not None:
+        mask &= partials["continent"].isin(list(continents))
+    return partials[mask]
+
+
+def merge_moments(moments: pd.DataFrame) -> pd.DataFrame:
+    """Combine group moments into one row per (x, y) pair."""
+    m = moments[(moments["n"] > 0) | (moments["pinf_x"] + moments["ninf_x"] > 0)]
+    x_codes, x_names = pd.factorize(m["x"])
+    y_codes, y_names = pd.factorize(m["y"])
+    codes, pair_codes = pd.factorize(x_codes * max(len(y_names), 1) + y_codes)
+    size = len(pair_codes)
+
+    def total(values) -> np.ndarray:
+        return np.bincount(codes, weights=values, minlength=size)
+
+    # Rows holding only infinite values have n == 0 and NaN moments; they add nothing here.
+    n = m["n"].to_numpy(dtype=float)
+    mean_x_in = m["mean_x"].fillna(0.0).to_numpy(dtype=float)
+    mean_y_in = m["mean_y"].fillna(0.0).to_numpy(dtype=float)
+    count = total(n)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x = total(n * mean_x_in) / count
+        mean_y = total(n * mean_y_in) / count
+    dx = np.nan_to_num(mean_x_in - mean_x[codes])
+    dy = np.nan_to_num(mean_y_in - mean_y[codes])
+    min_x = np.full(size, np.inf)
+    max_x = np.full(size, -np.inf)
+    np.fmin.at(min_x, codes, m["min_x"].to_numpy(dtype=float))
+    np.fmax.at(max_x, codes, m["max_x"].to_numpy(dtype=float))
+    empty = count == 0
+    min_x[empty] = np.nan
+    max_x[empty] = np.nan
+    m2_x = total(m["m2_x"].fillna(0.0).to_numpy(dtype=float) + n * dx ** 2)
+    m2_y = total(m["m2_y"].fillna(0.0).to_numpy(dtype=float) + n * dy ** 2)
+    c_xy = total(m["c_xy"].fillna(0.0).to_numpy(dtype=float) + n * dx * dy)
+    m2_x[empty] = m2_y[empty] = c_xy[empty] = np.nan
+    return pd.DataFrame({
+        "x": np.asarray(x_names, dtype=object)[pair_codes // max(len(y_names), 1)],
+        "y": np.asarray(y_names, dtype=object)[pair_codes % max(len(y_names), 1)],
+        "n": count,
+        "mean_x": mean_x,
+        "mean_y": mean_y,
+        "m2_x": m2_x,
+        "m2_y": m2_y,
+        "c_xy": c_xy,
+        "min_x": min_x,
+        "max_x": max_x,
+        "pinf_x": total(m["pinf_x"].to_numpy(dtype=float)),
+        "ninf_x": total(m["ninf_x"].to_numpy(dtype=float)),
+    })
+
+
+def weighted_quantiles(values: np.ndarray, weights: np.ndarray, qs: Iterable[float]) -> np.ndarray:
+    """Linear-interpolated quantiles over weighted sketch points.
+
+    Each point sits at the midpoint of the ranks it represents, so with unit
+    weights this matches `pandas.Series.quantile` exactly.
+    """
+    qs = np.asarray(list(qs), dtype=float)
+    if len(values) == 0:
+        return np.full(len(qs), np.nan)
+    order = np.argsort(values, kind="stable")
+    values = np.asarray(values, dtype=float)[order]
+    weights = np.asarray(weights, dtype=float)[order]
+    positions = np.cumsum(weights) - weights + (weights - 1.0) / 2.0
+    total = weights.sum()
+    return np.interp(qs * (total - 1.0), positions, values)
+
+
+def summary_from_partials(
+    moments: pd.DataFrame,
+    quantiles: pd.DataFrame,
+    years: Optional[Tuple[int, int]] = None,
+    continents: Optional[Iterable[str]] = None,
+    percentiles: Iterable[float] = SUMMARY_PERCENTILES,
+) -> pd.DataFrame:
+    """Assemble a `describe`-shaped summary (columns as rows) from partials."""
+    percentiles = list(percentiles)
+    labels = [f"{p * 100:g}%" for p in percentiles]
+    diag = moments[moments["x"] == moments["y"]]
+    merged = merge_moments(filter_partials(diag, years, continents)).set_index("x")
+    q = filter_partials(quantiles, years, continents)
+    q_by_column = dict(tuple(q.groupby("column", sort=False)))
+
+    cols = _present_columns(moments)
+    rows = {}
+    for col in cols:
+        row = {"count": 0.0, "mean": np.nan, "std": np.nan, "min": np.nan}
+        row.update({label: np.nan for label in labels})
+        row["max"] = np.nan
+        if col in merged.index:
+            r = merged.loc[col]
+            n, pinf, ninf = float(r["n"]), float(r["pinf_x"]), float(r["ninf_x"])
+            row["count"] = n + pinf + ninf
+            row["mean"] = r["mean_x"]
+            row["std"] = np.sqrt(r["m2_x"] / (n - 1.0)) if n > 1 else np.nan
+            row["min"] = r["min_x"] if n > 0 else np.inf
+            row["max"] = r["max_x"] if n > 0 else -np.inf
+            # Mirror describe(): any infinity dominates the mean and makes std undefined.
+            if pinf or ninf:
+                row["mean"] = np.nan if (pinf and ninf) else (np.inf if pinf else -np.inf)
+                row["std"] = np.nan
+            if pinf:
+                row["max"] = np.inf
+            if ninf:
+                row["min"] = -np.inf
+            qc = q_by_column.get(col, q.iloc[:0])
+            for label, value in zip(labels, weighted_quantiles(qc["value"].to_numpy(), qc["weight"].to_numpy(), percentiles)):
+                row[label] = value
+        rows[col] = row
+    return pd.DataFrame.from_dict(rows, orient="index", columns=["count", "mean", "std", "min"] + labels + ["max"])
+
+
+def correlations_from_partials(
+    moments: pd.DataFrame,
+    years: Optional[Tuple[int, int]] = None,
+    continents: Optional[Iterable[str]] = None,
+) -> pd.DataFrame:
+    """Pairwise-complete Pearson matrix assembled from co-moment partials."""
+    merged = merge_moments(filter_partials(moments, years, continents))
+    cols = _present_columns(moments)
+    result = np.full((len(cols), len(cols)), np.nan)
+    denom = np.sqrt(merged["m2_x"].to_numpy() * merged["m2_y"].to_numpy())
+    with np.errstate(divide="ignore", invalid="ignore"):
+        r = np.clip(merged["c_xy"].to_numpy() / denom, -1.0, 1.0)
+    r[(denom <= 0) | (merged["n"].to_numpy() <= 1)] = np.nan
+    position = {c: i for i, c in enumerate(cols)}
+    i = merged["x"].map(position).to_numpy()
+    j = merged["y"].map(position).to_numpy()
+    result[i, j] = r
+    result[j, i] = r
+    return pd.DataFrame(result, index=cols, columns=cols)